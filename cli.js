@@ -16,6 +16,12 @@ for (let i = 0; i < args.length; i++) {
         case '--delay':
             options.delay = parseInt(args[++i]);
             break;
+        case '--concurrency':
+            options.concurrency = parseInt(args[++i]);
+            break;
+        case '--archive':
+            options.archive = true;
+            break;
         case '--output-dir':
             options.outputDir = args[++i];
             break;
@@ -28,8 +34,11 @@ Usage: node cli.js [options]
 
 Options:
   --max-pages <number>    Maximum number of pages to crawl (default: 10)
-  --delay <number>        Delay between requests in ms (default: 1500)
+  --delay <number>        Delay between request starts in ms, across all
+                          parallel requests (default: 1500)
+  --concurrency <number>  Number of pages fetched in parallel (default: 4)
   --output-dir <path>     Output directory for documentation (default: ./docs)
+  --archive               Save pages into <output-dir>/angular-docs.tar
   --help, -h              Show this help message
 
 Examples:
@@ -53,12 +62,15 @@ Examples:
 // Set defaults
 if (!options.maxPages) options.maxPages = 10;
 if (!options.delay) options.delay = 1500;
+if (!options.concurrency) options.concurrency = 4;
 if (!options.outputDir) options.outputDir = path.join(__dirname, 'docs');
 
 console.log('Starting Angular Documentation Crawler with options:');
 console.log(`  Max pages: ${options.maxPages}`);
 console.log(`  Delay: ${options.delay}ms`);
+console.log(`  Concurrency: ${options.concurrency}`);
 console.log(`  Output directory: ${options.outputDir}`);
+if (options.archive) console.log('  Archive: angular-docs.tar');
 console.log('');
 
 // Override the default crawler configuration
@@ -78,6 +90,8 @@ async function configuredMain() {
         const crawler = new AngularDocsCrawler({
             maxPages: options.maxPages,
             delay: options.delay,
+            concurrency: options.concurrency,
+            archive: options.archive,
             outputDir: options.outputDir
         });
         
@@ -1,18 +1,128 @@
 const axios = require('axios');
 const cheerio = require('cheerio');
+const crypto = require('crypto');
+const http = require('http');
+const https = require('https');
+const os = require('os');
 const fs = require('fs-extra');
 const path = require('path');
 const { URL } = require('url');
+const { StringDecoder } = require('string_decoder');
+const PriorityQueue = require('./priority-queue');
+const ParserPool = require('./parser-pool');
+const { parsePage } = require('./page-parser');
+const { createCachedLookup } = require('./dns-cache');
+const TarWriter = require('./tar-writer');
+
+const DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+};
+
+// Sitemaps are scanned as a stream rather than loaded into a DOM
+const SITEMAP_ROOT_PATTERN = /<(?:[\w-]+:)?(sitemapindex|urlset)[\s>]/;
+const LOC_PATTERN = /<(?:[\w-]+:)?loc>\s*([^<]*?)\s*<\/(?:[\w-]+:)?loc>/g;
+const XML_ENTITIES = { '&amp;': '&', '&lt;': '<', '&gt;': '>', '&quot;': '"', '&apos;': "'" };
+const MAX_SITEMAP_DEPTH = 2;
+// axios' timeout stops applying once headers arrive, so streamed sitemaps
+// are abandoned if no data arrives for this long
+const SITEMAP_IDLE_TIMEOUT = 10000;
+
+// Attributes, whitespace and digits (dates, versions, counters) are ignored
+// when comparing page content, so near-identical pages hash the same
+const DIGEST_NOISE_PATTERN = /<([a-z][\w-]*)[^>]*>|\s+|\d+/gi;
+
+// Path separators and characters that are invalid in filenames all map to '_'
+const LEADING_SLASH_PATTERN = /^\//;
+const FILENAME_UNSAFE_PATTERN = /[/<>:"\\|?*\x00-\x1f\x7f-\x9f]/g;
+
+// Canonicalization: repeated slashes in paths and tracking query parameters
+const REPEATED_SLASH_PATTERN = /\/{2,}/g;
+const TRACKING_PARAM_PATTERN = /^utm_/i;
+
+const DEFAULT_PRIORITY_SECTIONS = ['guide', 'tutorials', 'reference', 'api', 'cli', 'overview'];
+
+function escapeRegExp(text) {
+    return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+// Frontier order: priority sections first, then shallower pages, then FIFO
+function compareQueueEntries(a, b) {
+    return (a.tier - b.tier) || (a.depth - b.depth) || (a.seq - b.seq);
+}
+
+const ALLOWED_HOSTS = new Set(['angular.dev', 'www.angular.dev']);
+const URL_CACHE_SIZE = 200000;
+
+// Bounded memoization for the pure URL helpers. The same navigation links
+// appear on every page, so most lookups hit the cache.
+function memoize(fn, maxSize = URL_CACHE_SIZE) {
+    const cache = new Map();
+    return function (key) {
+        if (cache.has(key)) {
+            return cache.get(key);
+        }
+        const value = fn.call(this, key);
+        if (cache.size >= maxSize) {
+            cache.delete(cache.keys().next().value);
+        }
+        cache.set(key, value);
+        return value;
+    };
+}
 
 class AngularDocsCrawler {
     constructor(options = {}) {
         this.baseUrl = 'https://angular.dev';
-        this.visited = new Set();
-        this.queue = [];
+        this.visited = new Set(); // Every URL taken from the queue
+        this.savedPages = []; // URLs of pages written to outputDir
+        this.writtenPaths = new Set(); // Files written during this crawl
+        this.queue = new PriorityQueue(compareQueueEntries);
+        this.queueSeq = 0; // Insertion counter, keeps equal-priority URLs in FIFO order
+        this.queued = new Set(); // Every URL ever queued, to avoid duplicates
+        this.contentDigests = new Set(); // Digests of saved page content
+        this.duplicatePages = 0;
         this.maxPages = options.maxPages || 500; // Limit to prevent infinite crawling
         this.delay = options.delay || 1000; // Delay between requests in ms
+        this.concurrency = options.concurrency || 4; // Number of pages fetched in parallel
+        this.nextRequestAt = 0; // Earliest time the next request may start, shared by all slots
+        this.useSitemap = options.useSitemap !== false; // Seed the queue from sitemap.xml
+        this.maxFileSize = options.maxFileSize || 5 * 1024 * 1024; // Largest response body to download, in bytes
+        this.dnsCacheTtl = options.dnsCacheTtl || 3600000; // How long resolved addresses are reused, in ms
+        const prioritySections = options.prioritySections || DEFAULT_PRIORITY_SECTIONS; // Crawled before other pages
+        // Matched against the whole URL so classifying a link needs no URL parse
+        this.priorityPattern = new RegExp(
+            `^[a-z][a-z\\d+.-]*://[^/?#]+/(?:${prioritySections.map(escapeRegExp).join('|')})(?:[/?#]|$)`,
+            'i'
+        );
+        // Worker threads used for HTML parsing; 0 parses on the main thread
+        this.parseWorkers = options.parseWorkers !== undefined
+            ? options.parseWorkers
+            : Math.min(this.concurrency, os.cpus().length);
+        this.parserPool = null;
+        // Write pages into a single tar archive instead of one file each
+        this.archive = options.archive === true;
+        this.archivePath = null;
+        this.archiveWriter = null;
         this.outputDir = options.outputDir || path.join(__dirname, '..', 'docs');
         this.logFile = path.join(__dirname, '..', 'logs', 'crawler.log');
+        this.logStream = null;
+        this.fileLogging = true; // Turned off if the log file cannot be written
+
+        // One client for the whole crawl so TCP/TLS connections are kept
+        // alive and reused across requests, and hostnames are resolved once
+        // per dnsCacheTtl. axios already asks for gzip/deflate/br-compressed
+        // responses.
+        const lookup = createCachedLookup(this.dnsCacheTtl);
+        this.http = axios.create({
+            timeout: 10000,
+            headers: DEFAULT_HEADERS,
+            httpAgent: new http.Agent({ keepAlive: true, maxSockets: this.concurrency, lookup }),
+            httpsAgent: new https.Agent({ keepAlive: true, maxSockets: this.concurrency, lookup })
+        });
+
+        // URL helpers are pure per instance, so cache their results
+        this.normalizeUrl = memoize(this.normalizeUrl);
+        this.isValidAngularDevUrl = memoize(this.isValidAngularDevUrl);
         
         // Initialize output directory
         fs.ensureDirSync(this.outputDir);
@@ -23,18 +133,97 @@ class AngularDocsCrawler {
         const timestamp = new Date().toISOString();
         const logMessage = `[${timestamp}] ${message}\n`;
         console.log(message);
-        fs.appendFileSync(this.logFile, logMessage);
+        if (!this.fileLogging) {
+            return;
+        }
+        // Append through a stream so logging never blocks the event loop
+        if (!this.logStream) {
+            const stream = fs.createWriteStream(this.logFile, { flags: 'a' });
+            stream.on('error', error => {
+                // Keep crawling with console output only
+                console.error(`Cannot write log file ${this.logFile}: ${error.message}`);
+                this.fileLogging = false;
+                if (this.logStream === stream) {
+                    this.logStream = null;
+                }
+            });
+            this.logStream = stream;
+        }
+        this.logStream.write(logMessage);
     }
 
-    async delay(ms) {
+    async closeLog() {
+        if (this.logStream) {
+            const stream = this.logStream;
+            this.logStream = null;
+            // end() calls back on finish or with the error that stopped the stream
+            await new Promise(resolve => stream.end(() => resolve()));
+        }
+    }
+
+    async sleep(ms) {
         return new Promise(resolve => setTimeout(resolve, ms));
     }
 
+    async waitForRequestSlot() {
+        // Space request starts by `delay` across all in-flight slots, so
+        // concurrency overlaps slow responses without raising the request rate
+        const now = Date.now();
+        const startAt = Math.max(now, this.nextRequestAt);
+        this.nextRequestAt = startAt + this.delay;
+        if (startAt > now) {
+            await this.sleep(startAt - now);
+        }
+    }
+
+    async httpGet(url, config) {
+        await this.waitForRequestSlot();
+        return this.http.get(url, config);
+    }
+
+    priorityTier(url) {
+        return this.priorityPattern.test(url) ? 0 : 1;
+    }
+
+    enqueue(url, depth = 0) {
+        if (this.queued.has(url)) {
+            return;
+        }
+        this.queued.add(url);
+        this.queue.push({ tier: this.priorityTier(url), depth, seq: this.queueSeq++, url });
+    }
+
+    dequeue() {
+        return this.queue.pop();
+    }
+
+    get queueSize() {
+        return this.queue.size;
+    }
+
     normalizeUrl(url) {
         try {
             const urlObj = new URL(url, this.baseUrl);
-            // Remove fragment and normalize
+            // Remove fragment and normalize. URL already lowercases the
+            // scheme and host and drops default ports.
             urlObj.hash = '';
+
+            let pathname = urlObj.pathname.replace(REPEATED_SLASH_PATTERN, '/');
+            if (pathname.length > 1 && pathname.endsWith('/')) {
+                pathname = pathname.slice(0, -1);
+            }
+            urlObj.pathname = pathname;
+
+            // Drop tracking parameters and sort the rest so that query order
+            // does not produce distinct URLs. The raw pairs are kept as-is so
+            // their encoding matches the links that were found.
+            if (urlObj.search) {
+                const pairs = urlObj.search.slice(1).split('&')
+                    .filter(pair => pair && !TRACKING_PARAM_PATTERN.test(pair))
+                    .sort();
+                urlObj.search = pairs.length > 0 ? `?${pairs.join('&')}` : '';
+            }
+
             return urlObj.href;
         } catch (error) {
             return null;
@@ -44,7 +233,7 @@ class AngularDocsCrawler {
     isValidAngularDevUrl(url) {
         try {
             const urlObj = new URL(url);
-            return urlObj.hostname === 'angular.dev' || urlObj.hostname === 'www.angular.dev';
+            return ALLOWED_HOSTS.has(urlObj.hostname);
         } catch (error) {
             return false;
         }
@@ -55,8 +244,8 @@ class AngularDocsCrawler {
             const urlObj = new URL(url);
             let pathname = urlObj.pathname;
             
-            // Remove leading slash and replace slashes with underscores
-            pathname = pathname.replace(/^\//, '').replace(/\//g, '_');
+            // Remove leading slash and replace slashes and unsafe characters with underscores
+            pathname = pathname.replace(LEADING_SLASH_PATTERN, '').replace(FILENAME_UNSAFE_PATTERN, '_');
             
             // If empty or just slashes, use 'index'
             if (!pathname || pathname === '') {
@@ -77,11 +266,14 @@ class AngularDocsCrawler {
     async fetchPage(url) {
         try {
             this.log(`Fetching: ${url}`);
-            const response = await axios.get(url, {
-                timeout: 10000,
-                headers: {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
+            const response = await this.httpGet(url, {
+                // Decode the body as UTF-8 text directly; with the default
+                // responseType axios also tries JSON.parse on every page
+                responseType: 'text',
+                responseEncoding: 'utf8',
+                // axios aborts the download as soon as the body grows past
+                // this, rather than fetching an oversized asset in full
+                maxContentLength: this.maxFileSize
             });
             return response.data;
         } catch (error) {
@@ -90,48 +282,167 @@ class AngularDocsCrawler {
         }
     }
 
-    extractLinks($) {
-        const links = [];
-        $('a[href]').each((i, element) => {
-            const href = $(element).attr('href');
-            if (href) {
-                const fullUrl = this.normalizeUrl(href);
-                if (fullUrl && this.isValidAngularDevUrl(fullUrl)) {
-                    links.push(fullUrl);
+    async streamSitemapLocs(sitemapUrl, onLoc) {
+        const response = await this.httpGet(sitemapUrl, { responseType: 'stream' });
+
+        const stream = response.data;
+        const decoder = new StringDecoder('utf8');
+        let rootTag = null;
+        let buffer = '';
+        let bytesRead = 0;
+        let idleTimer = null;
+        await new Promise((resolve, reject) => {
+            const resetIdleTimer = () => {
+                clearTimeout(idleTimer);
+                idleTimer = setTimeout(() => {
+                    stream.destroy(new Error(`No data received for ${SITEMAP_IDLE_TIMEOUT}ms`));
+                }, SITEMAP_IDLE_TIMEOUT);
+            };
+            resetIdleTimer();
+
+            stream.on('data', chunk => {
+                resetIdleTimer();
+                bytesRead += chunk.length;
+                if (bytesRead > this.maxFileSize) {
+                    stream.destroy(new Error(`Sitemap exceeds ${this.maxFileSize} bytes`));
+                    return;
                 }
-            }
+
+                buffer += decoder.write(chunk);
+                if (!rootTag) {
+                    const root = SITEMAP_ROOT_PATTERN.exec(buffer);
+                    if (root) {
+                        rootTag = root[1];
+                    }
+                }
+
+                // Emit every complete <loc> and keep only the unparsed tail,
+                // so memory stays bounded by a single entry
+                let consumed = 0;
+                let match;
+                LOC_PATTERN.lastIndex = 0;
+                while ((match = LOC_PATTERN.exec(buffer)) !== null) {
+                    onLoc(match[1].replace(/&(?:amp|lt|gt|quot|apos);/g, entity => XML_ENTITIES[entity]));
+                    consumed = LOC_PATTERN.lastIndex;
+                }
+                buffer = buffer.slice(consumed);
+            });
+            stream.on('end', resolve);
+            stream.on('error', reject);
+        }).finally(() => clearTimeout(idleTimer));
+
+        return rootTag === 'sitemapindex';
+    }
+
+    async parseSitemapDocument(sitemapUrl) {
+        const response = await this.httpGet(sitemapUrl, {
+            responseType: 'text',
+            maxContentLength: this.maxFileSize
         });
-        return links;
+        const $ = cheerio.load(response.data, { xml: true });
+        const localName = element => element.name.split(':').pop();
+
+        const root = $.root().children().get(0);
+        const locs = $('*').toArray()
+            .filter(element => localName(element) === 'loc')
+            .map(element => $(element).text().trim())
+            .filter(Boolean);
+        return { isIndex: Boolean(root) && localName(root) === 'sitemapindex', locs };
     }
 
-    extractContent($, url) {
-        // Remove script tags, style tags, and navigation elements
-        $('script, style, nav, header, footer, .sidebar, .navigation').remove();
-        
-        // Extract main content
-        let title = $('title').text() || $('h1').first().text() || 'Untitled';
-        let content = '';
-        
-        // Try to find main content area
-        const mainContent = $('main, .main-content, .content, .docs-content, article').first();
-        if (mainContent.length > 0) {
-            content = mainContent.html();
-        } else {
-            // Fallback to body content
-            content = $('body').html();
+    async discoverUrlsFromSitemap(sitemapUrl = `${this.baseUrl}/sitemap.xml`, depth = 0) {
+        const urls = new Set();
+        let locs = [];
+
+        try {
+            this.log(`Reading sitemap: ${sitemapUrl}`);
+            let isIndex = await this.streamSitemapLocs(sitemapUrl, loc => locs.push(loc));
+
+            // The regex scan only understands plain <loc>url</loc> entries; if it
+            // found nothing (e.g. CDATA-wrapped URLs), parse the XML properly
+            if (locs.length === 0) {
+                ({ isIndex, locs } = await this.parseSitemapDocument(sitemapUrl));
+            }
+
+            if (isIndex) {
+                // A sitemap index lists further sitemaps rather than pages
+                if (depth < MAX_SITEMAP_DEPTH) {
+                    // Only follow child sitemaps hosted on angular.dev
+                    for (const childSitemap of locs.filter(loc => this.isValidAngularDevUrl(loc))) {
+                        const childUrls = await this.discoverUrlsFromSitemap(childSitemap, depth + 1);
+                        childUrls.forEach(url => urls.add(url));
+                    }
+                }
+                return urls;
+            }
+
+            for (const loc of locs) {
+                const url = this.normalizeUrl(loc);
+                if (url && this.isValidAngularDevUrl(url)) {
+                    urls.add(url);
+                }
+            }
+            this.log(`Found ${urls.size} URLs in ${sitemapUrl}`);
+        } catch (error) {
+            this.log(`Error reading sitemap ${sitemapUrl}: ${error.message}`);
         }
-        
-        return {
-            url,
-            title: title.trim(),
-            content: content || '',
-            extractedAt: new Date().toISOString()
-        };
+
+        return urls;
+    }
+
+    extractLinks(hrefs) {
+        const links = new Set();
+        for (const href of hrefs) {
+            const fullUrl = this.normalizeUrl(href);
+            if (fullUrl && this.isValidAngularDevUrl(fullUrl)) {
+                links.add(fullUrl);
+            }
+        }
+        return Array.from(links);
+    }
+
+    async parsePage(html, url) {
+        // Parsing is CPU-bound; run it off the event loop when a pool exists.
+        // If the pool cannot parse the page (e.g. its worker died), parse it
+        // on the main thread instead so the page is not lost.
+        if (this.parserPool && this.parserPool.available) {
+            try {
+                return await this.parserPool.parse(html, url);
+            } catch (error) {
+                this.log(`Parser worker failed on ${url} (${error.message}); parsing on main thread`);
+            }
+        }
+        return parsePage(html, url);
+    }
+
+    contentDigest(content) {
+        const stripped = content.replace(DIGEST_NOISE_PATTERN, (match, tag) => (tag ? `<${tag}>` : ''));
+        return crypto.createHash('blake2b512').update(stripped).digest().subarray(0, 16).toString('base64');
     }
 
     async savePage(pageData) {
-        const filename = this.getPageFilename(pageData.url);
-        const filepath = path.join(this.outputDir, filename);
+        const digest = this.contentDigest(pageData.content);
+        if (this.contentDigests.has(digest)) {
+            this.duplicatePages++;
+            this.log(`Skipped duplicate content: ${pageData.url}`);
+            return false;
+        }
+        this.contentDigests.add(digest);
+
+        let filename = this.getPageFilename(pageData.url);
+
+        // Different URLs can map to the same filename (e.g. /a/b and /a_b);
+        // pick a free name from the in-memory set rather than probing the disk
+        if (this.writtenPaths.has(filename)) {
+            const ext = path.extname(filename);
+            const name = filename.slice(0, filename.length - ext.length);
+            let i = 1;
+            while (this.writtenPaths.has(`${name}_${i}${ext}`)) {
+                i++;
+            }
+            filename = `${name}_${i}${ext}`;
+        }
+        this.writtenPaths.add(filename);
         
         const htmlContent = `<!DOCTYPE html>
 <html lang="en">
@@ -150,11 +461,17 @@ class AngularDocsCrawler {
 </body>
 </html>`;
 
-        await fs.writeFile(filepath, htmlContent, 'utf8');
+        if (this.archiveWriter) {
+            await this.archiveWriter.add(filename, Buffer.from(htmlContent, 'utf8'));
+        } else {
+            await fs.writeFile(path.join(this.outputDir, filename), htmlContent, 'utf8');
+        }
+        this.savedPages.push(pageData.url);
         this.log(`Saved: ${filename}`);
+        return true;
     }
 
-    async crawlPage(url) {
+    async crawlPage(url, depth = 0) {
         if (this.visited.has(url) || this.visited.size >= this.maxPages) {
             return false;
         }
@@ -166,26 +483,68 @@ class AngularDocsCrawler {
             return false;
         }
 
-        const $ = cheerio.load(html);
+        let parsed;
+        try {
+            parsed = await this.parsePage(html, url);
+        } catch (error) {
+            this.log(`Error parsing ${url}: ${error.message}`);
+            return false;
+        }
         
-        // Extract and save page content
-        const pageData = this.extractContent($, url);
-        await this.savePage(pageData);
+        // Save page content
+        const saved = await this.savePage(parsed.pageData);
         
-        // Extract links for further crawling
-        const links = this.extractLinks($);
+        // Extract links for further crawling; enqueue() skips anything
+        // already queued, which includes every visited URL
+        const links = this.extractLinks(parsed.hrefs);
         for (const link of links) {
-            if (!this.visited.has(link)) {
-                this.queue.push(link);
-            }
+            this.enqueue(link, depth + 1);
         }
         
-        // Add delay to be respectful to the server
-        await this.delay(this.delay);
-        return true;
+        return saved;
+    }
+
+    async crawlQueue() {
+        let successfulPages = 0;
+        const inFlight = new Set();
+        while (this.queueSize > 0 || inFlight.size > 0) {
+            // Fill free slots up to the concurrency limit
+            while (this.queueSize > 0 && inFlight.size < this.concurrency && this.visited.size < this.maxPages) {
+                const { url, depth } = this.dequeue();
+                const task = this.crawlPage(url, depth)
+                    .then(success => {
+                        if (success) {
+                            successfulPages++;
+                        }
+                    })
+                    // Settle every task so a failed page never leaves others
+                    // running after the crawl has been torn down
+                    .catch(error => this.log(`Error crawling ${url}: ${error.message}`))
+                    .finally(() => inFlight.delete(task));
+                inFlight.add(task);
+            }
+
+            if (inFlight.size === 0) {
+                break;
+            }
+
+            // Wait for any page to finish; it may have queued new links
+            await Promise.race(inFlight);
+        }
+
+        return successfulPages;
     }
 
     async start() {
+        try {
+            return await this.runCrawl();
+        } finally {
+            // Flush and close the log even when the crawl fails
+            await this.closeLog();
+        }
+    }
+
+    async runCrawl() {
         this.log('Starting Angular documentation crawl...');
         
         // Start with main pages
@@ -199,25 +558,45 @@ class AngularDocsCrawler {
             `${this.baseUrl}/overview`
         ];
         
-        this.queue.push(...startUrls);
+        startUrls.forEach(url => this.enqueue(this.normalizeUrl(url)));
+
+        if (this.useSitemap) {
+            const sitemapUrls = await this.discoverUrlsFromSitemap();
+            sitemapUrls.forEach(url => this.enqueue(url, 1));
+        }
         
-        let successfulPages = 0;
-        while (this.queue.length > 0 && this.visited.size < this.maxPages) {
-            const url = this.queue.shift();
-            const success = await this.crawlPage(url);
-            if (success) {
-                successfulPages++;
+        if (this.parseWorkers > 0) {
+            this.parserPool = new ParserPool(this.parseWorkers);
+        }
+        if (this.archive) {
+            this.archivePath = path.join(this.outputDir, 'angular-docs.tar');
+            this.archiveWriter = new TarWriter(this.archivePath);
+        }
+
+        let successfulPages;
+        try {
+            successfulPages = await this.crawlQueue();
+        } finally {
+            if (this.parserPool) {
+                await this.parserPool.close();
+                this.parserPool = null;
+            }
+            if (this.archiveWriter) {
+                await this.archiveWriter.close();
+                this.archiveWriter = null;
+                this.log(`Pages archived to ${path.basename(this.archivePath)}`);
             }
         }
         
-        this.log(`Crawling completed. Downloaded ${successfulPages} pages successfully out of ${this.visited.size} attempted.`);
+        this.log(`Crawling completed. Downloaded ${successfulPages} pages successfully out of ${this.visited.size} attempted (${this.duplicatePages} duplicates skipped).`);
         
         // Generate summary
         const summary = {
             totalPages: successfulPages,
             attemptedPages: this.visited.size,
+            duplicatePages: this.duplicatePages,
             completedAt: new Date().toISOString(),
-            pages: Array.from(this.visited),
+            pages: this.savedPages,
             successfulCrawl: successfulPages > 0
         };
         
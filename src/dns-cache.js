@@ -0,0 +1,42 @@
+const dns = require('dns');
+
+// Drop-in replacement for dns.lookup() that remembers results for ttlMs, so
+// a crawl of a single host resolves it once instead of once per connection.
+// Concurrent lookups of the same host share a single dns.lookup() call.
+function createCachedLookup(ttlMs) {
+    const cache = new Map(); // key -> { expires, result }
+    const pending = new Map(); // key -> callbacks waiting on dns.lookup()
+
+    return function lookup(hostname, options, callback) {
+        if (typeof options === 'function') {
+            callback = options;
+            options = {};
+        } else if (typeof options === 'number') {
+            options = { family: options };
+        }
+
+        const key = `${hostname}|${options.family || 0}|${options.all ? 'all' : 'one'}`;
+        const entry = cache.get(key);
+        if (entry && entry.expires > Date.now()) {
+            process.nextTick(callback, null, ...entry.result);
+            return;
+        }
+
+        if (pending.has(key)) {
+            pending.get(key).push(callback);
+            return;
+        }
+        pending.set(key, [callback]);
+
+        dns.lookup(hostname, options, (error, ...result) => {
+            const callbacks = pending.get(key);
+            pending.delete(key);
+            if (!error) {
+                cache.set(key, { expires: Date.now() + ttlMs, result });
+            }
+            callbacks.forEach(cb => cb(error, ...result));
+        });
+    };
+}
+
+module.exports = { createCachedLookup };
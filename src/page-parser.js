@@ -0,0 +1,55 @@
+const cheerio = require('cheerio');
+
+function extractContent($, url) {
+    // Remove script tags, style tags, and navigation elements
+    $('script, style, nav, header, footer, .sidebar, .navigation').remove();
+
+    // Extract main content
+    let title = $('title').text() || $('h1').first().text() || 'Untitled';
+    let content = '';
+
+    // Try to find main content area
+    const mainContent = $('main, .main-content, .content, .docs-content, article').first();
+    if (mainContent.length > 0) {
+        content = mainContent.html();
+    } else {
+        // Fallback to body content
+        content = $('body').html();
+    }
+
+    return {
+        url,
+        title: title.trim(),
+        content: content || '',
+        extractedAt: new Date().toISOString()
+    };
+}
+
+function extractHrefs($) {
+    const hrefs = new Set();
+    // Read attributes straight off the parsed nodes instead of wrapping
+    // every element in a cheerio object
+    for (const element of $('a[href]').toArray()) {
+        const href = element.attribs.href;
+        if (href) {
+            hrefs.add(href);
+        }
+    }
+    return Array.from(hrefs);
+}
+
+// Parses a page into its saved content and the raw hrefs it links to.
+// Kept free of crawler state so it can run inside a worker thread.
+function parsePage(html, url) {
+    // htmlparser2 is considerably faster than cheerio's default parse5
+    // backend and is lenient enough for content extraction
+    const $ = cheerio.load(html, { xml: { xmlMode: false } });
+
+    // Content is extracted first so links inside removed navigation
+    // elements are not followed
+    const pageData = extractContent($, url);
+    const hrefs = extractHrefs($);
+    return { pageData, hrefs };
+}
+
+module.exports = { parsePage, extractContent, extractHrefs };
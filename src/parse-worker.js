@@ -0,0 +1,10 @@
+const { parentPort } = require('worker_threads');
+const { parsePage } = require('./page-parser');
+
+parentPort.on('message', ({ id, html, url }) => {
+    try {
+        parentPort.postMessage({ id, result: parsePage(html, url) });
+    } catch (error) {
+        parentPort.postMessage({ id, error: error.message });
+    }
+});
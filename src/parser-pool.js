@@ -0,0 +1,106 @@
+const { Worker } = require('worker_threads');
+const path = require('path');
+
+const WORKER_PATH = path.join(__dirname, 'parse-worker.js');
+
+// A worker slot that exits this many times in a row within QUICK_EXIT_MS
+// of starting is not restarted again
+const QUICK_EXIT_MS = 1000;
+const MAX_QUICK_EXITS = 3;
+
+// Fixed pool of worker threads running parsePage(), so HTML parsing does
+// not block the event loop while other pages are downloading
+class ParserPool {
+    constructor(size) {
+        this.closed = false;
+        this.nextId = 0;
+        this.nextWorker = 0;
+        this.workers = [];
+        this.quickExits = [];
+        for (let i = 0; i < size; i++) {
+            this.quickExits.push(0);
+            this.workers.push(this.spawn(i));
+        }
+    }
+
+    // False once every worker has been given up on; callers should then
+    // parse on the main thread
+    get available() {
+        return !this.closed && this.workers.some(Boolean);
+    }
+
+    spawn(index) {
+        const worker = new Worker(WORKER_PATH);
+        worker.startedAt = Date.now();
+        worker.tasks = new Map(); // Pending task id -> { resolve, reject }
+
+        worker.on('message', ({ id, result, error }) => {
+            const task = worker.tasks.get(id);
+            worker.tasks.delete(id);
+            if (error) {
+                task.reject(new Error(error));
+            } else {
+                task.resolve(result);
+            }
+        });
+
+        worker.on('error', error => {
+            for (const task of worker.tasks.values()) {
+                task.reject(error);
+            }
+            worker.tasks.clear();
+        });
+
+        worker.on('exit', () => {
+            for (const task of worker.tasks.values()) {
+                task.reject(new Error('Parser worker exited'));
+            }
+            worker.tasks.clear();
+
+            if (this.closed) {
+                return;
+            }
+
+            // Replace a worker that died mid-crawl, but stop if it keeps
+            // failing right after startup
+            if (Date.now() - worker.startedAt < QUICK_EXIT_MS) {
+                this.quickExits[index]++;
+            } else {
+                this.quickExits[index] = 0;
+            }
+            this.workers[index] = this.quickExits[index] < MAX_QUICK_EXITS ? this.spawn(index) : null;
+        });
+
+        return worker;
+    }
+
+    parse(html, url) {
+        if (this.closed) {
+            return Promise.reject(new Error('Parser pool is closed'));
+        }
+
+        if (!this.available) {
+            return Promise.reject(new Error('No parser workers available'));
+        }
+
+        // Round-robin over the slots that still have a worker
+        let worker = null;
+        while (!worker) {
+            worker = this.workers[this.nextWorker];
+            this.nextWorker = (this.nextWorker + 1) % this.workers.length;
+        }
+
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            worker.tasks.set(id, { resolve, reject });
+            worker.postMessage({ id, html, url });
+        });
+    }
+
+    async close() {
+        this.closed = true;
+        await Promise.all(this.workers.filter(Boolean).map(worker => worker.terminate()));
+    }
+}
+
+module.exports = ParserPool;
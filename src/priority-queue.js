@@ -0,0 +1,62 @@
+// Binary min-heap ordered by a comparator, used as the crawl frontier
+class PriorityQueue {
+    constructor(compare) {
+        this.compare = compare;
+        this.items = [];
+    }
+
+    get size() {
+        return this.items.length;
+    }
+
+    push(item) {
+        const items = this.items;
+        items.push(item);
+
+        // Sift the new item up until its parent is not larger
+        let index = items.length - 1;
+        while (index > 0) {
+            const parent = (index - 1) >> 1;
+            if (this.compare(items[index], items[parent]) >= 0) {
+                break;
+            }
+            [items[index], items[parent]] = [items[parent], items[index]];
+            index = parent;
+        }
+    }
+
+    pop() {
+        const items = this.items;
+        if (items.length === 0) {
+            return undefined;
+        }
+
+        const top = items[0];
+        const last = items.pop();
+        if (items.length > 0) {
+            items[0] = last;
+
+            // Sift the moved item down below any smaller child
+            let index = 0;
+            for (;;) {
+                const left = index * 2 + 1;
+                const right = left + 1;
+                let smallest = index;
+                if (left < items.length && this.compare(items[left], items[smallest]) < 0) {
+                    smallest = left;
+                }
+                if (right < items.length && this.compare(items[right], items[smallest]) < 0) {
+                    smallest = right;
+                }
+                if (smallest === index) {
+                    break;
+                }
+                [items[index], items[smallest]] = [items[smallest], items[index]];
+                index = smallest;
+            }
+        }
+        return top;
+    }
+}
+
+module.exports = PriorityQueue;
@@ -0,0 +1,93 @@
+const fs = require('fs-extra');
+
+const BLOCK_SIZE = 512;
+const NAME_FIELD_SIZE = 100;
+
+function octal(value, width) {
+    return `${value.toString(8).padStart(width - 1, '0')}\0`;
+}
+
+// 512-byte ustar header for a regular file ('0') or pax extended header ('x')
+function tarHeader(name, size, mtime, type) {
+    const header = Buffer.alloc(BLOCK_SIZE);
+    header.write(name, 0, NAME_FIELD_SIZE, 'utf8');
+    header.write(octal(0o644, 8), 100);
+    header.write(octal(0, 8), 108);
+    header.write(octal(0, 8), 116);
+    header.write(octal(size, 12), 124);
+    header.write(octal(mtime, 12), 136);
+    header.write(' '.repeat(8), 148);
+    header.write(type, 156);
+    header.write('ustar\0', 257);
+    header.write('00', 263);
+
+    let checksum = 0;
+    for (const byte of header) {
+        checksum += byte;
+    }
+    header.write(`${checksum.toString(8).padStart(6, '0')}\0 `, 148);
+    return header;
+}
+
+// "<length> path=<name>\n", where <length> counts its own digits
+function paxRecord(key, value) {
+    const body = ` ${key}=${value}\n`;
+    const bodyLength = Buffer.byteLength(body);
+    let length = bodyLength + String(bodyLength).length;
+    if (String(length).length !== String(bodyLength).length) {
+        length = bodyLength + String(length).length;
+    }
+    return Buffer.from(`${length}${body}`);
+}
+
+function padding(size) {
+    const remainder = size % BLOCK_SIZE;
+    return remainder === 0 ? null : Buffer.alloc(BLOCK_SIZE - remainder);
+}
+
+// Appends files to a single tar archive through one buffered stream, so
+// a crawl produces one file instead of one open/write/close per page
+class TarWriter {
+    constructor(filepath) {
+        this.stream = fs.createWriteStream(filepath, { highWaterMark: 1 << 20 });
+        this.finished = new Promise((resolve, reject) => {
+            this.stream.on('finish', resolve);
+            this.stream.on('error', reject);
+        });
+        // Surface stream errors from add()/close() rather than as unhandled rejections
+        this.finished.catch(() => {});
+    }
+
+    async add(name, data) {
+        const mtime = Math.floor(Date.now() / 1000);
+        const chunks = [];
+
+        // Names longer than the header field are carried in a pax record
+        if (Buffer.byteLength(name) > NAME_FIELD_SIZE) {
+            const record = paxRecord('path', name);
+            chunks.push(tarHeader('PaxHeader', record.length, mtime, 'x'), record, padding(record.length));
+        }
+        chunks.push(tarHeader(name, data.length, mtime, '0'), data, padding(data.length));
+
+        let flushed = true;
+        for (const chunk of chunks) {
+            if (chunk) {
+                flushed = this.stream.write(chunk);
+            }
+        }
+        if (!flushed) {
+            await Promise.race([
+                new Promise(resolve => this.stream.once('drain', resolve)),
+                this.finished
+            ]);
+        }
+    }
+
+    async close() {
+        // An archive ends with two empty blocks
+        this.stream.end(Buffer.alloc(BLOCK_SIZE * 2));
+        await this.finished;
+    }
+}
+
+module.exports = TarWriter;